@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.translation import gettext_lazy as _
 
 class DrfpasswordlessConfig(AppConfig):
@@ -6,4 +7,11 @@ class DrfpasswordlessConfig(AppConfig):
     verbose = _("DRF Passwordless")
 
     def ready(self):
+        from drfpasswordless.settings import api_settings
+
+        # Checked once here so token validation doesn't have to on every request.
+        expire_time = api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME
+        if isinstance(expire_time, bool) or not isinstance(expire_time, (int, float)) or expire_time <= 0:
+            raise ImproperlyConfigured("PASSWORDLESS_TOKEN_EXPIRE_TIME must be a positive number of seconds.")
+
         import drfpasswordless.signals
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from drfpasswordless.utils import deactivate_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Deactivates expired callback tokens. Run periodically, e.g. from cron."
+
+    def handle(self, *args, **options):
+        count = deactivate_expired_tokens()
+        self.stdout.write("Deactivated %d expired token(s)." % count)
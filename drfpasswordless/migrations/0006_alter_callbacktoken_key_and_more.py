@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-15 08:23
+
+import drfpasswordless.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drfpasswordless', '0005_auto_20201117_0410'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='callbacktoken',
+            name='key',
+            field=models.CharField(default=drfpasswordless.models.generate_numeric_token, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='callbacktoken',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['key', 'type'], name='cbt_key_active_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callbacktoken',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'to_alias_type'], name='cbt_user_active_alias_idx'),
+        ),
+    ]
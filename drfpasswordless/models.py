@@ -1,9 +1,8 @@
 # models.py
+import secrets
 import uuid
 from django.db import models
 from django.conf import settings
-import string
-from django.utils.crypto import get_random_string
 
 def generate_hex_token():
     return uuid.uuid1().hex
@@ -13,8 +12,9 @@ def generate_numeric_token():
     """
     Generate a random 6 digit string of numbers.
     We use this formatting to allow leading 0s.
+    One draw from the OS CSPRNG, rather than one per digit.
     """
-    return get_random_string(length=6, allowed_chars=string.digits)
+    return '%06d' % secrets.randbelow(10 ** 6)
 
 
 class CallbackTokenManger(models.Manager):
@@ -65,4 +65,11 @@ class CallbackToken(AbstractBaseCallbackToken):
     type = models.CharField(max_length=20, choices=TOKEN_TYPES)
 
     class Meta(AbstractBaseCallbackToken.Meta):
-        verbose_name = 'Callback Token'
\ No newline at end of file
+        verbose_name = 'Callback Token'
+        # Partial indexes: only active tokens are ever looked up, so inactive rows stay out of the index.
+        indexes = [
+            models.Index(fields=['key', 'type'], name='cbt_key_active_type_idx',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['user', 'to_alias_type'], name='cbt_user_active_alias_idx',
+                         condition=models.Q(is_active=True)),
+        ]
\ No newline at end of file
@@ -202,12 +202,15 @@ class CallbackTokenAuthSerializer(AbstractBaseCallbackTokenSerializer):
             alias_type, alias = self.validate_alias(attrs)
             callback_token = attrs.get('token', None)
             user = User.objects.get(**{alias_type: alias})
-            token = CallbackToken.objects.get(**{'user': user,
-                                                 'key': callback_token,
-                                                 'type': CallbackToken.TOKEN_TYPE_AUTH,
-                                                 'is_active': True})
-
-            if token.user == user:
+            # Only load what the checks below and verify_user_alias read.
+            token = CallbackToken.objects.only('id', 'user', 'to_alias', 'to_alias_type').get(**{
+                'user': user,
+                'key': callback_token,
+                'type': CallbackToken.TOKEN_TYPE_AUTH,
+                'is_active': True,
+            })
+
+            if token.user_id == user.pk:
                 # Check the token type for our uni-auth method.
                 # authenticates and checks the expiry of the callback token.
                 if not user.is_active:
@@ -217,7 +220,7 @@ class CallbackTokenAuthSerializer(AbstractBaseCallbackTokenSerializer):
                 if api_settings.PASSWORDLESS_USER_MARK_EMAIL_VERIFIED \
                         or api_settings.PASSWORDLESS_USER_MARK_MOBILE_VERIFIED:
                     # Mark this alias as verified
-                    user = User.objects.get(pk=token.user.pk)
+                    user = User.objects.get(pk=token.user_id)
                     success = verify_user_alias(user, token)
 
                     if success is False:
@@ -254,12 +257,15 @@ class CallbackTokenVerificationSerializer(AbstractBaseCallbackTokenSerializer):
             user = User.objects.get(**{'id': user_id, alias_type: alias})
             callback_token = attrs.get('token', None)
 
-            token = CallbackToken.objects.get(**{'user': user,
-                                                 'key': callback_token,
-                                                 'type': CallbackToken.TOKEN_TYPE_VERIFY,
-                                                 'is_active': True})
+            # Only load what the checks below and verify_user_alias read.
+            token = CallbackToken.objects.only('id', 'user', 'to_alias', 'to_alias_type').get(**{
+                'user': user,
+                'key': callback_token,
+                'type': CallbackToken.TOKEN_TYPE_VERIFY,
+                'is_active': True,
+            })
 
-            if token.user == user:
+            if token.user_id == user.pk:
                 # Mark this alias as verified
                 success = verify_user_alias(user, token)
                 if success is False:
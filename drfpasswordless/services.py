@@ -1,25 +1,53 @@
 # services.py
+import logging
+from django.db import router, transaction
 from django.utils.module_loading import import_string
+from drfpasswordless.models import CallbackToken
 from drfpasswordless.settings import api_settings
 from drfpasswordless.utils import (
     create_callback_token_for_user,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class TokenService(object):
     @staticmethod
     def send_token(user, alias_type, token_type, **message_payload):
         token = create_callback_token_for_user(user, alias_type, token_type)
-        send_action = None
+        send_action_path = None
 
-        if user.pk in api_settings.PASSWORDLESS_DEMO_USERS.keys():
+        if user.pk in api_settings.PASSWORDLESS_DEMO_USERS:
             return True
         if alias_type == 'email':
-            send_action = import_string(api_settings.PASSWORDLESS_EMAIL_CALLBACK)
+            send_action_path = api_settings.PASSWORDLESS_EMAIL_CALLBACK
         elif alias_type == 'mobile':
-            send_action = import_string(api_settings.PASSWORDLESS_SMS_CALLBACK)
+            send_action_path = api_settings.PASSWORDLESS_SMS_CALLBACK
         elif alias_type == 'call':
-            send_action = import_string(api_settings.PASSWORDLESS_CALL_CALLBACK)
+            send_action_path = api_settings.PASSWORDLESS_CALL_CALLBACK
+
+        if api_settings.PASSWORDLESS_ASYNC_BACKEND == 'celery':
+            if token is None:
+                return False
+            from drfpasswordless.tasks import send_callback_token
+
+            def enqueue():
+                # A broker outage must fail the send like the inline senders do, not the request.
+                try:
+                    send_callback_token.delay(send_action_path, str(user.pk), str(token.pk), **message_payload)
+                except Exception as e:
+                    logger.error("Failed to enqueue token %s for user %s: %s", token.key, user.pk, e)
+                    return False
+                return True
+
+            # Enqueue once the token is committed so the worker can load it.
+            using = router.db_for_write(CallbackToken)
+            if transaction.get_connection(using).in_atomic_block:
+                transaction.on_commit(enqueue, using=using)
+                return True
+            return enqueue()
+
+        send_action = import_string(send_action_path)
         # Send to alias
         success = send_action(user, token, **message_payload)
-        return success
\ No newline at end of file
+        return success
@@ -1,5 +1,6 @@
 # settings.py
 from django.conf import settings
+from django.core.signals import setting_changed
 from rest_framework.settings import APISettings
 
 USER_SETTINGS = getattr(settings, 'PASSWORDLESS_AUTH', None)
@@ -97,7 +98,10 @@ DEFAULTS = {
     'PASSWORDLESS_CALL_CALLBACK': 'drfpasswordless.utils.send_call_with_callback_token',
 
     # Token Generation Retry Count
-    'PASSWORDLESS_TOKEN_GENERATION_ATTEMPTS': 3
+    'PASSWORDLESS_TOKEN_GENERATION_ATTEMPTS': 3,
+
+    # Sends tokens from a task queue instead of the request. None sends inline, 'celery' uses Celery.
+    'PASSWORDLESS_ASYNC_BACKEND': None,
 }
 
 # List of settings that may be in string import notation.
@@ -106,4 +110,13 @@ IMPORT_STRINGS = (
     'PASSWORDLESS_CONTEXT_PROCESSORS',
 )
 
-api_settings = APISettings(USER_SETTINGS, DEFAULTS, IMPORT_STRINGS)
\ No newline at end of file
+api_settings = APISettings(USER_SETTINGS, DEFAULTS, IMPORT_STRINGS)
+
+
+def reload_api_settings(*args, **kwargs):
+    if kwargs['setting'] == 'PASSWORDLESS_AUTH':
+        api_settings.reload()
+        api_settings._user_settings = kwargs['value'] or {}
+
+
+setting_changed.connect(reload_api_settings)
@@ -8,6 +8,7 @@ from drfpasswordless.models import CallbackToken
 from drfpasswordless.models import generate_numeric_token
 from drfpasswordless.settings import api_settings
 from drfpasswordless.services import TokenService
+from drfpasswordless.utils import invalidate_callback_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +19,24 @@ def invalidate_previous_tokens(sender, instance, created, **kwargs):
     Invalidates all previously issued tokens of that type when a new one is created, used, or anything like that.
     """
 
-    if instance.user.pk in api_settings.PASSWORDLESS_DEMO_USERS.keys():
+    if instance.user_id in api_settings.PASSWORDLESS_DEMO_USERS:
         return
 
     if isinstance(instance, CallbackToken):
-        CallbackToken.objects.active().filter(user=instance.user, type=instance.type).exclude(id=instance.id).update(is_active=False)
+        previous_tokens = CallbackToken.objects.active().filter(user_id=instance.user_id, type=instance.type).exclude(id=instance.id)
+        previous_keys = list(previous_tokens.values_list('key', flat=True))
+        if previous_keys:
+            previous_tokens.update(is_active=False)
+            invalidate_callback_token_cache(*previous_keys)
+
+
+@receiver([signals.post_save, signals.post_delete], sender=CallbackToken)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    Drops any cached lookup for this token's key, including a cached miss from before it existed
+    and the cached token itself once it has been deleted.
+    """
+    invalidate_callback_token_cache(instance.key)
 
 
 @receiver(signals.pre_save, sender=CallbackToken)
@@ -110,11 +124,11 @@ def update_alias_verification(sender, instance, **kwargs):
                             success = TokenService.send_token(instance, 'email', CallbackToken.TOKEN_TYPE_VERIFY, **message_payload)
 
                             if success:
-                                logger.info('drfpasswordless: Successfully sent email on updated address: %s'
-                                            % instance_email)
+                                logger.info('drfpasswordless: Successfully sent email on updated address: %s',
+                                            instance_email)
                             else:
-                                logger.info('drfpasswordless: Failed to send email to updated address: %s'
-                                            % instance_email)
+                                logger.info('drfpasswordless: Failed to send email to updated address: %s',
+                                            instance_email)
 
                 except User.DoesNotExist:
                     # User probably is just initially being created
@@ -142,11 +156,11 @@ def update_alias_verification(sender, instance, **kwargs):
                             success = TokenService.send_token(instance, 'mobile', CallbackToken.TOKEN_TYPE_VERIFY, **message_payload)
 
                             if success:
-                                logger.info('drfpasswordless: Successfully sent SMS on updated mobile: %s'
-                                            % instance_mobile)
+                                logger.info('drfpasswordless: Successfully sent SMS on updated mobile: %s',
+                                            instance_mobile)
                             else:
-                                logger.info('drfpasswordless: Failed to send SMS to updated mobile: %s'
-                                            % instance_mobile)
+                                logger.info('drfpasswordless: Failed to send SMS to updated mobile: %s',
+                                            instance_mobile)
 
                 except User.DoesNotExist:
                     # User probably is just initially being created
@@ -0,0 +1,19 @@
+# tasks.py
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.utils.module_loading import import_string
+from drfpasswordless.models import CallbackToken
+
+User = get_user_model()
+
+
+@shared_task
+def send_callback_token(send_action_path, user_pk, token_pk, **message_payload):
+    """
+    Sends a callback token from a worker, off the request path.
+    The user and token are reloaded by primary key so only ids cross the broker.
+    """
+    send_action = import_string(send_action_path)
+    user = User.objects.get(pk=user_pk)
+    token = CallbackToken.objects.get(pk=token_pk)
+    return send_action(user, token, **message_payload)
@@ -1,13 +1,18 @@
 # utils.py
+import functools
 import logging
 import os
 import random
+from datetime import timedelta
 from django.contrib.auth import get_user_model
-from django.core.exceptions import PermissionDenied, ValueError
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
 from django.core.mail import send_mail
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.template import loader
 from django.utils import timezone
-from django.db import transaction
+from django.db import connections, router, transaction
 from rest_framework.authtoken.models import Token
 from drfpasswordless.models import CallbackToken, generate_numeric_token
 from drfpasswordless.settings import api_settings
@@ -18,6 +23,134 @@ User = get_user_model()
 # Valid alias types for validation
 VALID_ALIAS_TYPES = {'EMAIL', 'MOBILE', 'CALL'}
 
+def _build_alias_field_map():
+    # Calls go to the mobile alias, so CALL shares the MOBILE field names.
+    field_map = {
+        alias_type: (getattr(api_settings, f'PASSWORDLESS_USER_{alias_type}_FIELD_NAME'),
+                     getattr(api_settings, f'PASSWORDLESS_USER_{alias_type}_VERIFIED_FIELD_NAME'))
+        for alias_type in VALID_ALIAS_TYPES - {'CALL'}
+    }
+    field_map['CALL'] = field_map['MOBILE']
+    return field_map
+
+# (alias field name, verified field name) per alias type, resolved once instead of per call
+_ALIAS_FIELD_MAP = _build_alias_field_map()
+
+@receiver(setting_changed)
+def _reload_alias_field_map(setting, **kwargs):
+    if setting == 'PASSWORDLESS_AUTH':
+        _ALIAS_FIELD_MAP.update(_build_alias_field_map())
+
+# Common spellings of each alias type mapped to (settings name, stored to_alias_type);
+# calls are sent to, and stored as, the mobile alias.
+_NORMALIZED_ALIAS_TYPES = {
+    spelling: (alias_type, 'mobile' if alias_type == 'CALL' else alias_type.lower())
+    for alias_type in VALID_ALIAS_TYPES
+    for spelling in (alias_type, alias_type.lower())
+}
+
+def normalize_alias_type(alias_type):
+    """
+    Returns the (settings name, stored to_alias_type) pair for an alias type, or None if it's invalid.
+    """
+    normalized = _NORMALIZED_ALIAS_TYPES.get(alias_type)
+    if normalized is None and isinstance(alias_type, str):
+        # Mixed case spellings still work, they just take the slow path.
+        normalized = _NORMALIZED_ALIAS_TYPES.get(alias_type.upper())
+    return normalized
+
+# Random picks tried before scanning the whole virtual number pool
+VIRTUAL_NUMBER_SAMPLE_ATTEMPTS = 3
+
+# How long a lookup for an unknown token is remembered, in seconds
+NEGATIVE_TOKEN_CACHE_TIMEOUT = 60
+
+def callback_token_cache_key(callback_token):
+    return f"pwdless:cbt:{callback_token}"
+
+def invalidate_callback_token_cache(*callback_tokens):
+    """
+    Drops cached lookups for the given token keys.
+    Must be called whenever a token is created or stops being active.
+
+    The keys are dropped now and again once the surrounding transaction commits,
+    since a concurrent lookup can't see the change before then and may re-cache
+    the old state, e.g. a miss for a token that is still being created.
+    """
+    cache_keys = [callback_token_cache_key(key) for key in callback_tokens]
+    cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys), using=router.db_for_write(CallbackToken))
+
+def get_cached_callback_token(callback_token):
+    """
+    Looks up an active callback token, going to the database only on a cache miss.
+    Returns a (pk, user_id, type, to_alias, created_at) tuple, or None if there is
+    no active token with that key, or more than one.
+    """
+    cache_key = callback_token_cache_key(callback_token)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        # An empty tuple marks a key we already know is unknown, inactive or ambiguous.
+        return cached or None
+
+    # Keys aren't unique in the database, so never pick one of several matching tokens.
+    tokens = list(CallbackToken.objects.active().filter(key=callback_token).values_list(
+        'pk', 'user_id', 'type', 'to_alias', 'created_at'
+    )[:2])
+    if len(tokens) != 1:
+        cache.set(cache_key, (), NEGATIVE_TOKEN_CACHE_TIMEOUT)
+        return None
+
+    token = tokens[0]
+    cache.set(cache_key, token, api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME)
+    return token
+
+def _can_update_returning(connection):
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+def consume_callback_token(callback_token, token_type):
+    """
+    Deactivates an active token of the given type and returns its user id.
+    Returns None if there is no such token or another request consumed it first.
+    """
+    connection = connections[router.db_for_write(CallbackToken)]
+    cache_key = callback_token_cache_key(callback_token)
+    if cache.get(cache_key) is None and _can_update_returning(connection):
+        # Cache miss: read and deactivate in one statement instead of SELECT + UPDATE.
+        opts = CallbackToken._meta
+        qn = connection.ops.quote_name
+        is_active, key, type_, user = (
+            qn(opts.get_field(name).column) for name in ('is_active', 'key', 'type', 'user')
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {qn(opts.db_table)} SET {is_active} = %s "
+                f"WHERE {key} = %s AND {is_active} = %s AND {type_} = %s RETURNING {user}",
+                [False, callback_token, True, token_type]
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            return None
+        invalidate_callback_token_cache(callback_token)
+        if len(rows) > 1:
+            # Keys aren't unique in the database; a duplicated key is burned rather than
+            # handed to whichever user's row came back first.
+            logger.warning("Token %s matched %s active tokens, deactivated all of them", callback_token, len(rows))
+            return None
+        return rows[0][0]
+
+    cached_token = get_cached_callback_token(callback_token)
+    if cached_token is None or cached_token[2] != token_type:
+        return None
+    # A zero count means the token was consumed or replaced since it was cached.
+    consumed = CallbackToken.objects.filter(pk=cached_token[0], is_active=True).update(is_active=False)
+    invalidate_callback_token_cache(callback_token)
+    return cached_token[1] if consumed else None
+
 def authenticate_by_token(callback_token):
     """
     Authenticates a user using a callback token.
@@ -28,42 +161,64 @@ def authenticate_by_token(callback_token):
         return None
 
     try:
-        token = CallbackToken.objects.select_related('user').get(
-            key=callback_token,
-            is_active=True,
-            type=CallbackToken.TOKEN_TYPE_AUTH
-        )
-        with transaction.atomic():
-            token.is_active = False  # Mark token as used
-            token.save()
-        logger.info(f"Authenticated user {token.user.id} with token {callback_token}")
-        return token.user
+        user_id = consume_callback_token(callback_token, CallbackToken.TOKEN_TYPE_AUTH)
+        if user_id is None:
+            raise CallbackToken.DoesNotExist
+        user = User.objects.get(pk=user_id)
+
+        logger.info("Authenticated user %s with token %s", user.id, callback_token)
+        return user
 
     except CallbackToken.DoesNotExist:
-        logger.info(f"Authentication failed: Token {callback_token} does not exist or is inactive")
+        logger.info("Authentication failed: Token %s does not exist or is inactive", callback_token)
         return None
     except User.DoesNotExist:
-        logger.error(f"Authentication failed: User for token {callback_token} does not exist")
+        logger.error("Authentication failed: User for token %s does not exist", callback_token)
         return None
     except PermissionDenied:
-        logger.warning(f"Authentication failed: Permission denied for token {callback_token}")
+        logger.warning("Authentication failed: Permission denied for token %s", callback_token)
         return None
     except Exception as e:
-        logger.error(f"Unexpected error during authentication with token {callback_token}: {str(e)}")
+        logger.error("Unexpected error during authentication with token %s: %s", callback_token, e)
         return None
 
 def select_virtual_number():
+    """
+    Picks a random virtual number that no active token is currently using.
+    """
     pool = api_settings.PASSWORDLESS_VIRTUAL_NUMBER_POOL
     if not pool:
         raise ValueError("No virtual number pool configured.")
-    return random.choice(pool)
-    
-    used = CallbackToken.objects.filter(is_active=True, type=CallbackToken.TOKEN_TYPE_AUTH, to_alias_type='mobile').values_list('key', flat=True)
+
+    # Only numbers from the pool can collide, so let the key index narrow the scan to those.
+    used = set(CallbackToken.objects.active().filter(key__in=pool).values_list('key', flat=True))
+
+    # A few random picks almost always land on a free number in a lightly used pool,
+    # so the full list of free numbers is only built when the pool is busy.
+    for _ in range(VIRTUAL_NUMBER_SAMPLE_ATTEMPTS):
+        number = random.choice(pool)
+        if number not in used:
+            return number
+
     available = [n for n in pool if n not in used]
     if not available:
         raise ValueError("No available virtual numbers.")
     return random.choice(available)
 
+def get_user_alias(user, alias_field):
+    """
+    Returns the user's alias as a string, or None if it is unset.
+    Phone number objects (e.g. from django-phonenumber-field) are converted to E.164.
+    """
+    alias = getattr(user, alias_field, None)
+    if not alias:
+        return None
+    if isinstance(alias, str):
+        return alias
+    if hasattr(alias, 'as_e164'):
+        return alias.as_e164
+    return str(alias)
+
 def create_callback_token_for_user(user, alias_type, token_type):
     """
     Creates a callback token for a user based on alias_type and token_type.
@@ -73,63 +228,59 @@ def create_callback_token_for_user(user, alias_type, token_type):
         logger.error("Token creation failed: Missing user, alias_type, or token_type")
         return None
 
-    alias_type_lower = alias_type.lower()
-    if alias_type_lower == 'call':
-        to_alias_field = api_settings.PASSWORDLESS_USER_MOBILE_FIELD_NAME
-        to_alias_type = 'mobile'
-        try:
-            key = select_virtual_number()
-        except ValueError as e:
-            logger.error(str(e))
-            return None
-    else:
-        alias_type_u = alias_type.upper()
-        if alias_type_u not in VALID_ALIAS_TYPES:
-            logger.error(f"Token creation failed: Invalid alias type {alias_type}")
-            return None
-        to_alias_field = getattr(api_settings, f'PASSWORDLESS_USER_{alias_type_u}_FIELD_NAME')
-        to_alias_type = alias_type_lower
-        key = generate_numeric_token()
+    normalized = normalize_alias_type(alias_type)
+    if normalized is None:
+        logger.error("Token creation failed: Invalid alias type %s", alias_type)
+        return None
+    alias_type_u, to_alias_type = normalized
+    to_alias_field = _ALIAS_FIELD_MAP[alias_type_u][0]
 
     try:
-        alias = str(getattr(user, to_alias_field, None))
+        alias = get_user_alias(user, to_alias_field)
         if not alias:
-            logger.error(f"Token creation failed: No {to_alias_field} found for user {user.id}")
+            logger.error("Token creation failed: No %s found for user %s", to_alias_field, user.id)
             return None
 
+        # Handle demo users before picking a key, so they never cost a key or virtual number lookup
+        demo_users = api_settings.PASSWORDLESS_DEMO_USERS
+        if alias in demo_users:
+            token_key = demo_users[alias]
+            if not token_key:
+                logger.error("Token creation failed: Invalid demo token key for alias %s", alias)
+                return None
+            token = CallbackToken.objects.filter(
+                user=user,
+                is_active=True,
+                to_alias_type=to_alias_type,
+                type=token_type,
+                key=token_key
+            ).first()
+            if token:
+                logger.info("Reusing existing token for demo user %s", user.id)
+                return token
+        elif alias_type_u == 'CALL':
+            try:
+                token_key = select_virtual_number()
+            except ValueError as e:
+                logger.error("%s", e)
+                return None
+        else:
+            token_key = generate_numeric_token()
+
         with transaction.atomic():
-            # Handle demo users
-            if alias in api_settings.PASSWORDLESS_DEMO_USERS:
-                token = CallbackToken.objects.filter(user=user, is_active=True, to_alias_type=to_alias_type).first()
-                if token:
-                    logger.info(f"Reusing existing token for demo user {user.id}")
-                    return token
-                token_key = api_settings.PASSWORDLESS_DEMO_USERS.get(alias)
-                if not token_key:
-                    logger.error(f"Token creation failed: Invalid demo token key for alias {alias}")
-                    return None
-                return CallbackToken.objects.create(
-                    user=user,
-                    key=token_key,
-                    to_alias_type=to_alias_type,
-                    to_alias=alias,
-                    type=token_type
-                )
-
-            # Create new token for non-demo users
             return CallbackToken.objects.create(
                 user=user,
                 to_alias_type=to_alias_type,
                 to_alias=alias,
                 type=token_type,
-                key=key
+                key=token_key
             )
 
     except AttributeError as e:
-        logger.error(f"Invalid alias field configuration for {alias_type}: {str(e)}")
+        logger.error("Invalid alias field configuration for %s: %s", alias_type, e)
         return None
     except Exception as e:
-        logger.error(f"Failed to create token for user {user.id}, alias_type {alias_type}: {str(e)}")
+        logger.error("Failed to create token for user %s, alias_type %s: %s", user.id, alias_type, e)
         return None
 
 def validate_token_age(callback_token):
@@ -138,103 +289,135 @@ def validate_token_age(callback_token):
     Returns True if valid, False otherwise.
     """
     if not callback_token or not isinstance(callback_token, str):
-        logger.warning(f"Token validation failed: Invalid or empty token")
+        logger.warning("Token validation failed: Invalid or empty token")
         return False
 
     try:
-        token = CallbackToken.objects.select_related('user').get(
-            key=callback_token,
-            is_active=True
-        )
+        cached_token = get_cached_callback_token(callback_token)
+        if cached_token is None:
+            raise CallbackToken.DoesNotExist
+        token_pk, user_id, _, to_alias, created_at = cached_token
+
         # Use stored alias for demo user check to avoid redundant fetching
-        if token.to_alias in api_settings.PASSWORDLESS_DEMO_USERS:
-            logger.info(f"Token {callback_token} validated for demo user {token.user.id}")
+        if to_alias in api_settings.PASSWORDLESS_DEMO_USERS:
+            logger.info("Token %s validated for demo user %s", callback_token, user_id)
             return True
 
-        if not hasattr(api_settings, 'PASSWORDLESS_TOKEN_EXPIRE_TIME') or api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME <= 0:
-            logger.error(f"Token validation failed: Invalid or missing PASSWORDLESS_TOKEN_EXPIRE_TIME")
-            return False
-
-        seconds = (timezone.now() - token.created_at).total_seconds()
+        seconds = (timezone.now() - created_at).total_seconds()
         if seconds <= api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME:
-            logger.info(f"Token {callback_token} validated for user {token.user.id}")
+            logger.info("Token %s validated for user %s", callback_token, user_id)
             return True
 
-        with transaction.atomic():
-            token.is_active = False
-            token.save()
-        logger.info(f"Token {callback_token} expired for user {token.user.id}")
+        CallbackToken.objects.filter(pk=token_pk, is_active=True).update(is_active=False)
+        invalidate_callback_token_cache(callback_token)
+        logger.info("Token %s expired for user %s", callback_token, user_id)
         return False
 
     except CallbackToken.DoesNotExist:
-        logger.info(f"Token validation failed: Token {callback_token} does not exist or is inactive")
+        logger.info("Token validation failed: Token %s does not exist or is inactive", callback_token)
         return False
     except Exception as e:
-        logger.error(f"Unexpected error during token validation for {callback_token}: {str(e)}")
+        logger.error("Unexpected error during token validation for %s: %s", callback_token, e)
         return False
 
+def deactivate_expired_tokens(now=None):
+    """
+    Deactivates every expired, non-demo token in a single UPDATE.
+    Meant to run periodically, see the deactivate_expired_tokens management command.
+    Returns the number of tokens deactivated.
+    """
+    expired_before = (now or timezone.now()) - timedelta(seconds=api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME)
+    return CallbackToken.objects.active().filter(
+        created_at__lt=expired_before
+    ).exclude(
+        to_alias__in=list(api_settings.PASSWORDLESS_DEMO_USERS)
+    ).update(is_active=False)
+
 def verify_user_alias(user, token):
     """
     Marks a user's contact point (email or mobile) as verified based on token.
     Returns True if successful, False otherwise.
     """
-    if not user or not token or token.to_alias_type.upper() not in VALID_ALIAS_TYPES:
-        logger.error(f"Alias verification failed: Invalid user, token, or alias type {getattr(token, 'to_alias_type', None)}")
+    normalized = normalize_alias_type(getattr(token, 'to_alias_type', None))
+    if not user or not token or normalized is None:
+        logger.error("Alias verification failed: Invalid user, token, or alias type %s", getattr(token, 'to_alias_type', None))
         return False
 
     try:
-        alias_type_u = token.to_alias_type.upper()
-        alias_field = getattr(api_settings, f'PASSWORDLESS_USER_{alias_type_u}_FIELD_NAME')
-        verified_field = getattr(api_settings, f'PASSWORDLESS_USER_{alias_type_u}_VERIFIED_FIELD_NAME')
-        user_alias = str(getattr(user, alias_field, None))
+        alias_field, verified_field = _ALIAS_FIELD_MAP[normalized[0]]
+        user_alias = get_user_alias(user, alias_field)
 
         if not user_alias:
-            logger.error(f"Alias verification failed: No {token.to_alias_type.lower()} for user {user.id}")
+            logger.error("Alias verification failed: No %s for user %s", token.to_alias_type, user.id)
             return False
 
         if token.to_alias != user_alias:
-            logger.warning(f"Alias verification failed: Token alias {token.to_alias} does not match user {user.id}'s {alias_field}")
+            logger.warning("Alias verification failed: Token alias %s does not match user %s's %s", token.to_alias, user.id, alias_field)
             return False
 
-        with transaction.atomic():
-            setattr(user, verified_field, True)
-            user.save()
-        logger.info(f"Verified {token.to_alias_type.lower()} {token.to_alias} for user {user.id}")
+        # A targeted UPDATE skips rewriting every column and the user save signals.
+        User.objects.filter(pk=user.pk).update(**{verified_field: True})
+        setattr(user, verified_field, True)
+        logger.info("Verified %s %s for user %s", token.to_alias_type, token.to_alias, user.id)
         return True
 
     except AttributeError:
-        logger.error(f"Invalid configuration for alias type {token.to_alias_type}")
+        logger.error("Invalid configuration for alias type %s", token.to_alias_type)
         return False
     except Exception as e:
-        logger.error(f"Failed to verify alias for user {user.id}, type {token.to_alias_type}: {str(e)}")
+        logger.error("Failed to verify alias for user %s, type %s: %s", user.id, token.to_alias_type, e)
         return False
 
+@functools.lru_cache(maxsize=1)
+def _context_processors():
+    # Resolved once; non-callable entries are reported here instead of on every email.
+    processors = []
+    for processor in api_settings.PASSWORDLESS_CONTEXT_PROCESSORS or ():
+        if callable(processor):
+            processors.append(processor)
+        else:
+            logger.warning("Context processor %s is not callable", processor)
+    return tuple(processors)
+
+@receiver(setting_changed)
+def _clear_context_processors(setting, **kwargs):
+    if setting == 'PASSWORDLESS_AUTH':
+        _context_processors.cache_clear()
+
 def inject_template_context(context):
     """
     Injects additional context into email templates using configured processors.
+    The context is returned as is when there are no processors, so callers must not mutate it.
     """
     try:
-        updated_context = context.copy()
-        if not hasattr(api_settings, 'PASSWORDLESS_CONTEXT_PROCESSORS'):
-            logger.warning("No context processors configured in PASSWORDLESS_CONTEXT_PROCESSORS")
-            return updated_context
-
-        for processor in api_settings.PASSWORDLESS_CONTEXT_PROCESSORS:
-            if callable(processor):
-                updated_context.update(processor())
-            else:
-                logger.warning(f"Context processor {processor} is not callable")
+        processors = _context_processors()
+        if not processors:
+            return context
+
+        updated_context = dict(context)
+        for processor in processors:
+            updated_context.update(processor())
         return updated_context
     except Exception as e:
-        logger.error(f"Failed to inject template context: {str(e)}")
+        logger.error("Failed to inject template context: %s", e)
         return context
 
+@functools.lru_cache(maxsize=32)
+def _compiled_template(template_name):
+    # Loaded and parsed once per name, whether or not the cached template loader is enabled.
+    return loader.get_template(template_name)
+
+@receiver(setting_changed)
+def _clear_compiled_templates(setting, **kwargs):
+    if setting == 'TEMPLATES':
+        _compiled_template.cache_clear()
+
 def send_email_with_callback_token(user, email_token, **kwargs):
     """
     Sends an email with a callback token to the user.
     Returns True if successful, False otherwise.
     """
-    if not hasattr(api_settings, 'PASSWORDLESS_EMAIL_NOREPLY_ADDRESS') or not api_settings.PASSWORDLESS_EMAIL_NOREPLY_ADDRESS:
+    if not api_settings.PASSWORDLESS_EMAIL_NOREPLY_ADDRESS:
         logger.error("Email sending failed: PASSWORDLESS_EMAIL_NOREPLY_ADDRESS not configured")
         return False
 
@@ -243,18 +426,19 @@ def send_email_with_callback_token(user, email_token, **kwargs):
         return False
 
     try:
-        email_field = getattr(api_settings, 'PASSWORDLESS_USER_EMAIL_FIELD_NAME', 'email')
-        recipient_email = str(getattr(user, email_field, None))
+        email_field = _ALIAS_FIELD_MAP['EMAIL'][0]
+        # The token's alias is what was verified, and it outlives changes to the user row.
+        recipient_email = email_token.to_alias or get_user_alias(user, email_field)
         if not recipient_email:
-            logger.error(f"Email sending failed: No email address for user {user.id}")
+            logger.error("Email sending failed: No email address for user %s", user.id)
             return False
 
-        email_subject = kwargs.get('email_subject', getattr(api_settings, 'PASSWORDLESS_EMAIL_SUBJECT', 'Your Login Token'))
-        email_plaintext = kwargs.get('email_plaintext', getattr(api_settings, 'PASSWORDLESS_EMAIL_PLAINTEXT_MESSAGE', 'Your token is %s'))
-        email_html = kwargs.get('email_html', getattr(api_settings, 'PASSWORDLESS_EMAIL_TOKEN_HTML_TEMPLATE_NAME', 'passwordless_default_token_email.html'))
+        email_subject = kwargs.get('email_subject', api_settings.PASSWORDLESS_EMAIL_SUBJECT)
+        email_plaintext = kwargs.get('email_plaintext', api_settings.PASSWORDLESS_EMAIL_PLAINTEXT_MESSAGE)
+        email_html = kwargs.get('email_html', api_settings.PASSWORDLESS_EMAIL_TOKEN_HTML_TEMPLATE_NAME)
 
         context = inject_template_context({'callback_token': email_token.key})
-        html_message = loader.render_to_string(email_html, context)
+        html_message = _compiled_template(email_html).render(context)
 
         send_mail(
             subject=email_subject,
@@ -264,26 +448,35 @@ def send_email_with_callback_token(user, email_token, **kwargs):
             fail_silently=False,
             html_message=html_message
         )
-        logger.info(f"Sent email with token {email_token.key} to user {user.id}")
+        logger.info("Sent email with token %s to user %s", email_token.key, user.id)
         return True
 
     except Exception as e:
-        logger.error(f"Failed to send email to user {user.id} with token {getattr(email_token, 'key', 'unknown')}: {str(e)}")
+        logger.error("Failed to send email to user %s with token %s: %s", user.id, getattr(email_token, 'key', 'unknown'), e)
         return False
 
+@functools.lru_cache(maxsize=1)
+def _twilio_client():
+    """
+    Shared Twilio client, so its HTTP connection pool stays warm between sends.
+    Raises ImportError without twilio and KeyError without credentials; neither result is cached.
+    """
+    from twilio.rest import Client
+    return Client(os.environ['TWILIO_ACCOUNT_SID'], os.environ['TWILIO_AUTH_TOKEN'])
+
 def send_sms_with_callback_token(user, mobile_token, **kwargs):
     """
     Sends an SMS with a callback token to the user via Twilio.
     Returns True if successful or suppressed in test mode, False otherwise.
     """
-    if getattr(api_settings, 'PASSWORDLESS_TEST_SUPPRESSION', False):
-        if not hasattr(api_settings, 'PASSWORDLESS_MOBILE_NOREPLY_NUMBER') or not api_settings.PASSWORDLESS_MOBILE_NOREPLY_NUMBER:
+    if api_settings.PASSWORDLESS_TEST_SUPPRESSION:
+        if not api_settings.PASSWORDLESS_MOBILE_NOREPLY_NUMBER:
             logger.error("SMS sending suppressed but PASSWORDLESS_MOBILE_NOREPLY_NUMBER not configured")
             return False
-        logger.info(f"SMS sending suppressed for user {user.id} in test mode")
+        logger.info("SMS sending suppressed for user %s in test mode", user.id)
         return True
 
-    if not hasattr(api_settings, 'PASSWORDLESS_MOBILE_NOREPLY_NUMBER') or not api_settings.PASSWORDLESS_MOBILE_NOREPLY_NUMBER:
+    if not api_settings.PASSWORDLESS_MOBILE_NOREPLY_NUMBER:
         logger.error("SMS sending failed: PASSWORDLESS_MOBILE_NOREPLY_NUMBER not configured")
         return False
 
@@ -292,28 +485,21 @@ def send_sms_with_callback_token(user, mobile_token, **kwargs):
         return False
 
     try:
-        from twilio.rest import Client
-        twilio_client = Client(os.environ.get('TWILIO_ACCOUNT_SID'), os.environ.get('TWILIO_AUTH_TOKEN'))
-        if not twilio_client:
-            logger.error("SMS sending failed: Twilio credentials not configured")
-            return False
+        twilio_client = _twilio_client()
 
-        mobile_field = getattr(api_settings, 'PASSWORDLESS_USER_MOBILE_FIELD_NAME', 'mobile')
-        to_number = getattr(user, mobile_field, None)
+        mobile_field = _ALIAS_FIELD_MAP['MOBILE'][0]
+        to_number = mobile_token.to_alias or get_user_alias(user, mobile_field)
         if not to_number:
-            logger.error(f"SMS sending failed: No mobile number for user {user.id}")
+            logger.error("SMS sending failed: No mobile number for user %s", user.id)
             return False
 
-        if to_number.__class__.__name__ == 'PhoneNumber':
-            to_number = to_number.as_e164 if hasattr(to_number, 'as_e164') else str(to_number)
-
-        base_string = kwargs.get('mobile_message', getattr(api_settings, 'PASSWORDLESS_MOBILE_MESSAGE', 'Your token is %s'))
+        base_string = kwargs.get('mobile_message', api_settings.PASSWORDLESS_MOBILE_MESSAGE)
         twilio_client.messages.create(
             body=base_string % mobile_token.key,
-            to=str(to_number),
+            to=to_number,
             from_=api_settings.PASSWORDLESS_MOBILE_NOREPLY_NUMBER
         )
-        logger.info(f"Sent SMS with token {mobile_token.key} to user {user.id}")
+        logger.info("Sent SMS with token %s to user %s", mobile_token.key, user.id)
         return True
 
     except ImportError:
@@ -323,7 +509,7 @@ def send_sms_with_callback_token(user, mobile_token, **kwargs):
         logger.error("SMS sending failed: Twilio credentials or PASSWORDLESS_MOBILE_NOREPLY_NUMBER missing")
         return False
     except Exception as e:
-        logger.error(f"Failed to send SMS to user {user.id} with token {getattr(mobile_token, 'key', 'unknown')}: {str(e)}")
+        logger.error("Failed to send SMS to user %s with token %s: %s", user.id, getattr(mobile_token, 'key', 'unknown'), e)
         return False
 
 def send_call_with_callback_token(user, mobile_token, **kwargs):
@@ -331,8 +517,8 @@ def send_call_with_callback_token(user, mobile_token, **kwargs):
     Places a missed call to the user via Twilio using a virtual number.
     Returns True if successful or suppressed in test mode, False otherwise.
     """
-    if getattr(api_settings, 'PASSWORDLESS_TEST_SUPPRESSION', False):
-        logger.info(f"Missed call suppressed for user {user.id} in test mode")
+    if api_settings.PASSWORDLESS_TEST_SUPPRESSION:
+        logger.info("Missed call suppressed for user %s in test mode", user.id)
         return True
 
     if not user or not mobile_token or not mobile_token.key:
@@ -340,28 +526,21 @@ def send_call_with_callback_token(user, mobile_token, **kwargs):
         return False
 
     try:
-        from twilio.rest import Client
-        twilio_client = Client(os.environ.get('TWILIO_ACCOUNT_SID'), os.environ.get('TWILIO_AUTH_TOKEN'))
-        if not twilio_client:
-            logger.error("Missed call failed: Twilio credentials not configured")
-            return False
+        twilio_client = _twilio_client()
 
-        mobile_field = getattr(api_settings, 'PASSWORDLESS_USER_MOBILE_FIELD_NAME', 'mobile')
-        to_number = getattr(user, mobile_field, None)
+        mobile_field = _ALIAS_FIELD_MAP['MOBILE'][0]
+        to_number = mobile_token.to_alias or get_user_alias(user, mobile_field)
         if not to_number:
-            logger.error(f"Missed call failed: No mobile number for user {user.id}")
+            logger.error("Missed call failed: No mobile number for user %s", user.id)
             return False
 
-        if to_number.__class__.__name__ == 'PhoneNumber':
-            to_number = to_number.as_e164 if hasattr(to_number, 'as_e164') else str(to_number)
-
         twiml = '<Response><Reject reason="rejected" /></Response>'
         twilio_client.calls.create(
             twiml=twiml,
-            to=str(to_number),
+            to=to_number,
             from_=mobile_token.key
         )
-        logger.info(f"Sent missed call from {mobile_token.key} to user {user.id}")
+        logger.info("Sent missed call from %s to user %s", mobile_token.key, user.id)
         return True
 
     except ImportError:
@@ -371,22 +550,24 @@ def send_call_with_callback_token(user, mobile_token, **kwargs):
         logger.error("Missed call failed: Twilio credentials missing")
         return False
     except Exception as e:
-        logger.error(f"Failed to send missed call to user {user.id} with token {getattr(mobile_token, 'key', 'unknown')}: {str(e)}")
+        logger.error("Failed to send missed call to user %s with token %s: %s", user.id, getattr(mobile_token, 'key', 'unknown'), e)
         return False
 
 def create_authentication_token(user):
     """
     Creates or retrieves an authentication token for the user.
+    Returns a (token, created) tuple, or (None, False) on failure.
     """
     if not user:
         logger.error("Auth token creation failed: Invalid user")
-        return None
+        return None, False
 
     try:
-        with transaction.atomic():
-            token, created = Token.objects.get_or_create(user=user)
-        logger.info(f"{'Created' if created else 'Retrieved'} auth token for user {user.id}")
-        return token
+        # get_or_create already retries the lookup if a concurrent insert wins the race,
+        # so the common case is a single SELECT with no surrounding transaction.
+        token, created = Token.objects.get_or_create(user=user)
+        logger.info("%s auth token for user %s", 'Created' if created else 'Retrieved', user.id)
+        return token, created
     except Exception as e:
-        logger.error(f"Failed to create auth token for user {user.id}: {str(e)}")
-        return None
\ No newline at end of file
+        logger.error("Failed to create auth token for user %s: %s", user.id, e)
+        return None, False
@@ -172,7 +172,7 @@ class AbstractBaseObtainAuthToken(APIView):
                     # Return our key for consumption.
                     return Response(token_serializer.data, status=status.HTTP_200_OK)
         else:
-            logger.error("Couldn't log in unknown user. Errors on serializer: {}".format(serializer.error_messages))
+            logger.error("Couldn't log in unknown user. Errors on serializer: %s", serializer.error_messages)
         return Response({"detail": "Couldn't log you in. Try again later."}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -197,6 +197,6 @@ class VerifyAliasFromCallbackToken(APIView):
         if serializer.is_valid(raise_exception=True):
             return Response({"detail": "Alias verified."}, status=status.HTTP_200_OK)
         else:
-            logger.error("Couldn't verify unknown user. Errors on serializer: {}".format(serializer.error_messages))
+            logger.error("Couldn't verify unknown user. Errors on serializer: %s", serializer.error_messages)
 
         return Response({"detail": "We couldn't verify this alias. Try again later."}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -0,0 +1,79 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import transaction
+from django.test import TransactionTestCase
+from drfpasswordless.services import TokenService
+from drfpasswordless.settings import api_settings, DEFAULTS
+from drfpasswordless.utils import CallbackToken
+
+try:
+    import celery
+except ImportError:
+    celery = None
+
+User = get_user_model()
+
+
+@skipUnless(celery, "celery is not installed")
+class CeleryBackendTests(TransactionTestCase):
+    """
+    Runs outside a test transaction so on_commit callbacks fire on real commits.
+    """
+
+    def setUp(self):
+        api_settings.PASSWORDLESS_ASYNC_BACKEND = 'celery'
+        api_settings.PASSWORDLESS_EMAIL_NOREPLY_ADDRESS = 'noreply@example.com'
+        self.email_field_name = api_settings.PASSWORDLESS_USER_EMAIL_FIELD_NAME
+
+    def test_send_is_enqueued_on_commit(self):
+        user = User.objects.create(**{self.email_field_name: 'aaron@example.com'})
+
+        with mock.patch('drfpasswordless.tasks.send_callback_token.delay') as delay:
+            with transaction.atomic():
+                self.assertTrue(TokenService.send_token(user, 'email', CallbackToken.TOKEN_TYPE_AUTH))
+                delay.assert_not_called()
+
+        token = CallbackToken.objects.get(user=user)
+        delay.assert_called_once_with(api_settings.PASSWORDLESS_EMAIL_CALLBACK, str(user.pk), str(token.pk))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_nothing_is_enqueued_without_a_token(self):
+        user = User.objects.create(mobile='+15551234567')
+
+        with mock.patch('drfpasswordless.tasks.send_callback_token.delay') as delay:
+            self.assertFalse(TokenService.send_token(user, 'email', CallbackToken.TOKEN_TYPE_AUTH))
+        delay.assert_not_called()
+
+    def test_broker_failure_fails_the_send(self):
+        user = User.objects.create(**{self.email_field_name: 'aaron@example.com'})
+
+        with mock.patch('drfpasswordless.tasks.send_callback_token.delay', side_effect=OSError('broker down')):
+            self.assertFalse(TokenService.send_token(user, 'email', CallbackToken.TOKEN_TYPE_AUTH))
+
+    def test_broker_failure_after_commit_is_logged(self):
+        user = User.objects.create(**{self.email_field_name: 'aaron@example.com'})
+
+        with mock.patch('drfpasswordless.tasks.send_callback_token.delay', side_effect=OSError('broker down')):
+            with self.assertLogs('drfpasswordless.services', 'ERROR'):
+                with transaction.atomic():
+                    self.assertTrue(TokenService.send_token(user, 'email', CallbackToken.TOKEN_TYPE_AUTH))
+
+    def test_task_sends_to_token_alias(self):
+        from drfpasswordless.tasks import send_callback_token
+
+        # The worker can load the user before a changed alias is saved.
+        user = User.objects.create(**{self.email_field_name: 'aaron@example.com'})
+        token = CallbackToken.objects.create(user=user,
+                                             to_alias='aaron2@example.com',
+                                             to_alias_type='email',
+                                             type=CallbackToken.TOKEN_TYPE_VERIFY)
+
+        self.assertTrue(send_callback_token(api_settings.PASSWORDLESS_EMAIL_CALLBACK, str(user.pk), str(token.pk)))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['aaron2@example.com'])
+
+    def tearDown(self):
+        api_settings.PASSWORDLESS_ASYNC_BACKEND = DEFAULTS['PASSWORDLESS_ASYNC_BACKEND']
+        api_settings.PASSWORDLESS_EMAIL_NOREPLY_ADDRESS = DEFAULTS['PASSWORDLESS_EMAIL_NOREPLY_ADDRESS']
@@ -0,0 +1,279 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from drfpasswordless.settings import api_settings, DEFAULTS
+from drfpasswordless.utils import (
+    CallbackToken,
+    authenticate_by_token,
+    callback_token_cache_key,
+    create_authentication_token,
+    create_callback_token_for_user,
+    deactivate_expired_tokens,
+    inject_template_context,
+    select_virtual_number,
+    validate_token_age,
+    verify_user_alias,
+)
+
+User = get_user_model()
+
+
+def site_context_processor():
+    return {'site_name': 'Example'}
+
+
+class CallbackTokenCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.email_field_name = api_settings.PASSWORDLESS_USER_EMAIL_FIELD_NAME
+        self.user = User.objects.create(**{self.email_field_name: 'aaron@example.com'})
+
+    def create_token(self, key='123456'):
+        return CallbackToken.objects.create(user=self.user,
+                                            key=key,
+                                            to_alias='aaron@example.com',
+                                            to_alias_type='email',
+                                            type=CallbackToken.TOKEN_TYPE_AUTH)
+
+    def test_unknown_token_is_cached_until_created(self):
+        self.assertFalse(validate_token_age('123456'))
+        self.assertEqual(cache.get(callback_token_cache_key('123456')), ())
+
+        self.create_token('123456')
+        self.assertIsNone(cache.get(callback_token_cache_key('123456')))
+        self.assertTrue(validate_token_age('123456'))
+
+    def test_authenticated_token_cannot_be_replayed(self):
+        self.create_token('123456')
+        self.assertTrue(validate_token_age('123456'))
+
+        self.assertEqual(authenticate_by_token('123456'), self.user)
+        self.assertIsNone(authenticate_by_token('123456'))
+        self.assertFalse(validate_token_age('123456'))
+
+    def test_uncached_token_is_consumed_once(self):
+        self.create_token('123456')
+
+        # One statement to consume the token, one to load its user.
+        with self.assertNumQueries(2):
+            self.assertEqual(authenticate_by_token('123456'), self.user)
+        self.assertIsNone(authenticate_by_token('123456'))
+
+    def create_duplicate_tokens(self, key='123456'):
+        # bulk_create skips check_unique_tokens, as a race between two requests would.
+        other = User.objects.create(**{self.email_field_name: 'bill@example.com'})
+        CallbackToken.objects.bulk_create([
+            CallbackToken(user=user,
+                          key=key,
+                          to_alias=email,
+                          to_alias_type='email',
+                          type=CallbackToken.TOKEN_TYPE_AUTH)
+            for user, email in ((self.user, 'aaron@example.com'), (other, 'bill@example.com'))
+        ])
+
+    def test_duplicate_key_authenticates_nobody(self):
+        self.create_duplicate_tokens('123456')
+        self.assertIsNone(authenticate_by_token('123456'))
+
+    def test_duplicate_cached_key_authenticates_nobody(self):
+        self.create_duplicate_tokens('123456')
+        self.assertFalse(validate_token_age('123456'))
+        self.assertIsNone(authenticate_by_token('123456'))
+
+    def test_deleted_token_is_evicted(self):
+        token = self.create_token('123456')
+        self.assertTrue(validate_token_age('123456'))
+
+        token.delete()
+        self.assertFalse(validate_token_age('123456'))
+
+    def test_user_delete_evicts_tokens(self):
+        self.create_token('123456')
+        self.assertTrue(validate_token_age('123456'))
+
+        self.user.delete()
+        self.assertFalse(validate_token_age('123456'))
+
+    def test_replaced_token_is_evicted(self):
+        self.create_token('123456')
+        self.assertTrue(validate_token_age('123456'))
+
+        self.create_token('654321')
+        self.assertFalse(validate_token_age('123456'))
+        self.assertIsNone(authenticate_by_token('123456'))
+
+
+class CallbackTokenCommitTests(TransactionTestCase):
+    """
+    Runs outside a test transaction so on_commit callbacks fire on real commits.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.email_field_name = api_settings.PASSWORDLESS_USER_EMAIL_FIELD_NAME
+        self.user = User.objects.create(**{self.email_field_name: 'aaron@example.com'})
+
+    def test_miss_cached_before_commit_is_evicted(self):
+        with transaction.atomic():
+            CallbackToken.objects.create(user=self.user,
+                                         key='123456',
+                                         to_alias='aaron@example.com',
+                                         to_alias_type='email',
+                                         type=CallbackToken.TOKEN_TYPE_AUTH)
+            # A concurrent request can't see the uncommitted token and caches a miss.
+            cache.set(callback_token_cache_key('123456'), ())
+        self.assertTrue(validate_token_age('123456'))
+
+
+class ExpiredTokenTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.email_field_name = api_settings.PASSWORDLESS_USER_EMAIL_FIELD_NAME
+
+    def create_token(self, email, key, age):
+        user = User.objects.create(**{self.email_field_name: email})
+        token = CallbackToken.objects.create(user=user,
+                                             key=key,
+                                             to_alias=email,
+                                             to_alias_type='email',
+                                             type=CallbackToken.TOKEN_TYPE_AUTH)
+        created_at = timezone.now() - timedelta(seconds=age)
+        CallbackToken.objects.filter(pk=token.pk).update(created_at=created_at)
+        return token
+
+    def test_expired_token_is_deactivated_on_use(self):
+        expire_time = api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME
+        self.create_token('aaron@example.com', '111111', expire_time + 60)
+        other = self.create_token('bill@example.com', '222222', expire_time + 60)
+
+        self.assertFalse(validate_token_age('111111'))
+        self.assertEqual(list(CallbackToken.objects.active()), [other])
+
+    def test_expired_tokens_are_swept_together(self):
+        expire_time = api_settings.PASSWORDLESS_TOKEN_EXPIRE_TIME
+        self.create_token('aaron@example.com', '111111', expire_time + 60)
+        self.create_token('bill@example.com', '222222', expire_time + 60)
+        fresh = self.create_token('carl@example.com', '333333', 0)
+
+        call_command('deactivate_expired_tokens', stdout=StringIO())
+        self.assertEqual(list(CallbackToken.objects.active()), [fresh])
+        self.assertEqual(deactivate_expired_tokens(), 0)
+
+
+class DemoUserTokenTests(TestCase):
+
+    def setUp(self):
+        api_settings.PASSWORDLESS_DEMO_USERS = {'demo@example.com': '123456'}
+        self.email_field_name = api_settings.PASSWORDLESS_USER_EMAIL_FIELD_NAME
+        self.user = User.objects.create(**{self.email_field_name: 'demo@example.com'})
+
+    def test_demo_token_is_reused(self):
+        token = create_callback_token_for_user(self.user, 'email', CallbackToken.TOKEN_TYPE_AUTH)
+        self.assertEqual(token.key, '123456')
+
+        with self.assertNumQueries(1):
+            reused = create_callback_token_for_user(self.user, 'email', CallbackToken.TOKEN_TYPE_AUTH)
+        self.assertEqual(reused, token)
+
+        # Fully loaded, like a newly created token.
+        with self.assertNumQueries(0):
+            self.assertEqual((reused.to_alias, reused.type), ('demo@example.com', CallbackToken.TOKEN_TYPE_AUTH))
+
+    def tearDown(self):
+        api_settings.PASSWORDLESS_DEMO_USERS = DEFAULTS['PASSWORDLESS_DEMO_USERS']
+
+
+class VirtualNumberTests(TestCase):
+
+    def setUp(self):
+        api_settings.PASSWORDLESS_VIRTUAL_NUMBER_POOL = ['+15550000001', '+15550000002']
+        self.mobile_field_name = api_settings.PASSWORDLESS_USER_MOBILE_FIELD_NAME
+        self.user = User.objects.create(**{self.mobile_field_name: '+15551234567'})
+
+    def test_used_numbers_are_skipped(self):
+        CallbackToken.objects.create(user=self.user,
+                                     key='+15550000001',
+                                     to_alias='+15551234567',
+                                     to_alias_type='mobile',
+                                     type=CallbackToken.TOKEN_TYPE_AUTH)
+        self.assertEqual(select_virtual_number(), '+15550000002')
+
+    def test_exhausted_pool(self):
+        # Keys are unique across token types, so a verify token holds its number too.
+        pool = api_settings.PASSWORDLESS_VIRTUAL_NUMBER_POOL
+        for number, token_type in zip(pool, (CallbackToken.TOKEN_TYPE_AUTH, CallbackToken.TOKEN_TYPE_VERIFY)):
+            CallbackToken.objects.create(user=self.user,
+                                         key=number,
+                                         to_alias='+15551234567',
+                                         to_alias_type='mobile',
+                                         type=token_type)
+        self.assertRaises(ValueError, select_virtual_number)
+
+    def tearDown(self):
+        api_settings.PASSWORDLESS_VIRTUAL_NUMBER_POOL = DEFAULTS['PASSWORDLESS_VIRTUAL_NUMBER_POOL']
+
+
+class AliasFieldSettingsTests(TestCase):
+
+    def test_missing_alias_creates_no_token(self):
+        user = User.objects.create(mobile='+15551234567')
+        self.assertIsNone(create_callback_token_for_user(user, 'email', CallbackToken.TOKEN_TYPE_AUTH))
+        self.assertFalse(CallbackToken.objects.filter(user=user).exists())
+
+    def test_field_names_follow_setting_changes(self):
+        user = User.objects.create(email='aaron@example.com', mobile='+15551234567')
+
+        with override_settings(PASSWORDLESS_AUTH={'PASSWORDLESS_USER_EMAIL_FIELD_NAME': 'mobile'}):
+            token = create_callback_token_for_user(user, 'email', CallbackToken.TOKEN_TYPE_AUTH)
+        self.assertEqual(token.to_alias, '+15551234567')
+
+        token = create_callback_token_for_user(user, 'email', CallbackToken.TOKEN_TYPE_AUTH)
+        self.assertEqual(token.to_alias, 'aaron@example.com')
+
+
+class TemplateContextTests(TestCase):
+
+    def test_context_is_passed_through_without_processors(self):
+        context = {'callback_token': '123456'}
+        self.assertIs(inject_template_context(context), context)
+
+    def test_processors_are_merged(self):
+        processors = ['tests.test_utils.site_context_processor']
+        with override_settings(PASSWORDLESS_AUTH={'PASSWORDLESS_CONTEXT_PROCESSORS': processors}):
+            context = inject_template_context({'callback_token': '123456'})
+        self.assertEqual(context, {'callback_token': '123456', 'site_name': 'Example'})
+        self.assertEqual(inject_template_context({'callback_token': '123456'}), {'callback_token': '123456'})
+
+
+class SingleStatementWriteTests(TestCase):
+    """
+    Lone writes run in autocommit; no SAVEPOINT or BEGIN/COMMIT around them.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(email='aaron@example.com')
+
+    def test_verify_user_alias(self):
+        token = CallbackToken.objects.create(user=self.user,
+                                             to_alias='aaron@example.com',
+                                             to_alias_type='email',
+                                             type=CallbackToken.TOKEN_TYPE_VERIFY)
+        with self.assertNumQueries(1):
+            self.assertTrue(verify_user_alias(self.user, token))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.email_verified)
+
+    def test_create_authentication_token(self):
+        token, created = create_authentication_token(self.user)
+        self.assertTrue(created)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(create_authentication_token(self.user), (token, False))